@@ -11,10 +11,18 @@ This is ENGINE layer template data - minimal fields only.
 """
 
 import argparse
+import csv
 import random
 import math
+from collections import Counter
 from pathlib import Path
 
+try:
+    import numpy as np
+except ImportError:
+    print("ERROR: NumPy not installed. Run: pip install numpy")
+    exit(1)
+
 
 # Template countries with distinct colors
 # Format: (tag, name, color_rgb)
@@ -31,6 +39,30 @@ TEMPLATE_COUNTRIES = [
     ("GRY", "Gray Union", (120, 120, 130)),
 ]
 
+# Template countries with their definition file name (spaces removed)
+# Format: (tag, name, filename, color_rgb)
+COUNTRY_ENTRIES = [
+    (tag, name, name.replace(" ", "") + ".json5", color)
+    for tag, name, color in TEMPLATE_COUNTRIES
+]
+
+# JSON5 file bodies, filled in per country / province
+COUNTRY_FILE_TEMPLATE = (
+    "// {name}\n"
+    "{{\n"
+    '  tag: "{tag}",\n'
+    '  graphical_culture: "westerngfx",\n'
+    "  color: [{r}, {g}, {b}]\n"
+    "}}\n"
+)
+PROVINCE_HISTORY_TEMPLATE = (
+    "// Province {pid}: {name}\n"
+    "{{\n"
+    '  owner: "{owner}",\n'
+    '  controller: "{owner}"\n'
+    "}}\n"
+)
+
 # Max provinces per country
 MAX_PROVINCES_PER_COUNTRY = 10
 
@@ -44,9 +76,8 @@ def generate_country_tags(output_dir: Path) -> None:
         f.write("# Template country tags for Archon Engine\n")
         f.write("# Format: TAG = \"countries/Filename.json5\"\n\n")
 
-        for tag, name, _ in TEMPLATE_COUNTRIES:
-            filename = name.replace(" ", "")
-            f.write(f'{tag} = "countries/{filename}.json5"\n')
+        for tag, _, filename, _ in COUNTRY_ENTRIES:
+            f.write(f'{tag} = "countries/{filename}"\n')
 
     print(f"Generated: {tags_dir / '00_countries.txt'}")
 
@@ -56,53 +87,44 @@ def generate_country_files(output_dir: Path) -> None:
     countries_dir = output_dir / "common" / "countries"
     countries_dir.mkdir(parents=True, exist_ok=True)
 
-    for tag, name, (r, g, b) in TEMPLATE_COUNTRIES:
-        filename = name.replace(" ", "") + ".json5"
-        filepath = countries_dir / filename
-
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(f"// {name}\n")
-            f.write("{\n")
-            f.write(f'  tag: "{tag}",\n')
-            f.write('  graphical_culture: "westerngfx",\n')
-            f.write(f"  color: [{r}, {g}, {b}]\n")
-            f.write("}\n")
-
-        print(f"Generated: {filepath}")
-
-
-def load_definition_csv(definition_path: Path) -> list[dict]:
-    """Load province definitions from definition.csv including water flag."""
-    provinces = []
-
-    with open(definition_path, "r", encoding="utf-8") as f:
-        header = f.readline()  # Skip header
+    for tag, name, filename, (r, g, b) in COUNTRY_ENTRIES:
+        # Build the whole body first - one write per file
+        body = COUNTRY_FILE_TEMPLATE.format(name=name, tag=tag, r=r, g=g, b=b)
+        (countries_dir / filename).write_text(body, encoding="utf-8")
 
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
+    print(f"Generated: {len(TEMPLATE_COUNTRIES)} country files in {countries_dir}")
 
-            parts = line.split(";")
-            if len(parts) >= 5:
-                # Water flag: 'x' = land, empty = water
-                water_flag = parts[5].strip() if len(parts) > 5 else "x"
-                is_water = water_flag != "x"
 
-                provinces.append({
-                    "id": int(parts[0]),
-                    "r": int(parts[1]),
-                    "g": int(parts[2]),
-                    "b": int(parts[3]),
-                    "name": parts[4] if len(parts) > 4 else f"Province_{parts[0]}",
-                    "is_water": is_water
-                })
-
-    return provinces
+def load_definition_csv(definition_path: Path) -> dict[str, np.ndarray]:
+    """
+    Load province definitions from definition.csv including water flag.
+    Returns parallel column arrays: id, r, g, b, name, is_water.
+    """
+    with open(definition_path, "r", encoding="utf-8", newline="") as f:
+        f.readline()  # Skip header
+        rows = [
+            row for row in csv.reader(f, delimiter=";", quoting=csv.QUOTE_NONE)
+            if len(row) >= 5
+        ]
+
+    # Numeric columns parsed in one NumPy conversion
+    numbers = np.array([row[:4] for row in rows], dtype=np.int64).reshape(-1, 4)
+
+    return {
+        "id": numbers[:, 0],
+        "r": numbers[:, 1].astype(np.uint8),
+        "g": numbers[:, 2].astype(np.uint8),
+        "b": numbers[:, 3].astype(np.uint8),
+        "name": np.array([row[4] for row in rows], dtype=str),
+        # Water flag: 'x' = land, empty = water
+        "is_water": np.array(
+            [len(row) > 5 and row[5].strip() != "x" for row in rows], dtype=bool
+        ),
+    }
 
 
 def assign_provinces_to_countries(
-    provinces: list[dict],
+    province_ids: np.ndarray,
     map_width: int,
     map_height: int,
     hex_size: float,
@@ -123,23 +145,24 @@ def assign_provinces_to_countries(
     row_spacing = hex_height
     rows_per_col = int(map_height / row_spacing) + 2
 
-    province_positions = {}
-    for prov in provinces:
-        pid = prov["id"]
-        # Reconstruct hex position from province ID
-        col = (pid - 1) // rows_per_col
-        row = (pid - 1) % rows_per_col
-        cx = col * col_spacing + hex_size
-        cy = row * row_spacing + hex_height / 2
-        if col % 2 == 1:
-            cy += row_spacing / 2
-        province_positions[pid] = (cx, cy)
+    # Reconstruct hex positions from province IDs (vectorized)
+    ids = np.asarray(province_ids, dtype=np.int64)
+    hex_col, hex_row = np.divmod(ids - 1, rows_per_col)
+
+    # Per-column tables: x center and odd-column y offset only depend on the column
+    num_cols = int(hex_col.max()) + 1 if len(hex_col) else 0
+    col_range = np.arange(num_cols)
+    x_by_col = col_range * col_spacing + hex_size
+    y_offset_by_col = (col_range % 2) * (row_spacing / 2)
+
+    pos_x = x_by_col[hex_col]
+    pos_y = hex_row * row_spacing + hex_height / 2 + y_offset_by_col[hex_col]
 
     # Place country capitals spread far apart across the map
     capitals = []
-    # Use wider spacing - 5 columns x 2 rows for 10 countries
+    # Use wider spacing - 5 columns, 2 rows for 10 countries, more rows as needed
     cols = 5
-    rows = 2
+    rows = max(1, math.ceil(num_countries / cols))
 
     for i, (tag, _, _) in enumerate(TEMPLATE_COUNTRIES):
         col = i % cols
@@ -149,40 +172,31 @@ def assign_provinces_to_countries(
         y = 400 + row * ((map_height - 800) / (rows - 1)) if rows > 1 else map_height / 2
         capitals.append((tag, x, y))
 
-    # Track how many provinces each country has
-    country_counts = {tag: 0 for tag, _, _ in TEMPLATE_COUNTRIES}
-
     # Maximum radius from capital - provinces must be within this distance
     # This ensures countries don't spread too far and overlap
     max_radius = 400  # pixels
 
+    # Compare squared distances - no sqrt needed for a radius test
+    max_radius_sq = max_radius * max_radius
+
     # Assign provinces closest to their capital, one country at a time
     # This prevents interleaving and ensures contiguous clusters
+    assigned = np.zeros(len(ids), dtype=bool)
     for tag, cap_x, cap_y in capitals:
-        # Find all provinces within max_radius of this capital
-        nearby = []
-        for prov in provinces:
-            pid = prov["id"]
-            if pid not in province_positions:
-                continue
-            if pid in assignments:
-                continue  # Already assigned
-            cx, cy = province_positions[pid]
-            dist = math.sqrt((cx - cap_x) ** 2 + (cy - cap_y) ** 2)
-            if dist <= max_radius:
-                nearby.append((dist, pid))
-
-        # Sort by distance and assign closest ones
-        nearby.sort()
-        for dist, pid in nearby[:MAX_PROVINCES_PER_COUNTRY]:
+        # Find all unassigned provinces within max_radius of this capital
+        dist_sq = (pos_x - cap_x) ** 2 + (pos_y - cap_y) ** 2
+        nearby = np.flatnonzero(~assigned & (dist_sq <= max_radius_sq))
+
+        # Sort by distance (ties by province ID) and assign closest ones
+        nearby = nearby[np.lexsort((ids[nearby], dist_sq[nearby]))]
+        nearby = nearby[:MAX_PROVINCES_PER_COUNTRY]
+        assigned[nearby] = True
+        for pid in ids[nearby].tolist():
             assignments[pid] = tag
-            country_counts[tag] += 1
 
     # All unassigned provinces remain unowned (None)
-    for prov in provinces:
-        pid = prov["id"]
-        if pid not in assignments:
-            assignments[pid] = None
+    for pid in ids[~assigned].tolist():
+        assignments[pid] = None
 
     return assignments
 
@@ -200,60 +214,51 @@ def generate_province_ownership(
     provinces = load_definition_csv(definition_path)
 
     # Separate land and water provinces
-    land_provinces = [p for p in provinces if not p.get("is_water", False)]
-    water_provinces = [p for p in provinces if p.get("is_water", False)]
+    is_land = ~provinces["is_water"]
+    land_ids = provinces["id"][is_land]
+    land_names = provinces["name"][is_land]
+    water_count = len(is_land) - len(land_ids)
 
-    print(f"Loaded {len(provinces)} provinces from definition.csv")
-    print(f"  Land: {len(land_provinces)}, Water: {len(water_provinces)}")
+    print(f"Loaded {len(is_land)} provinces from definition.csv")
+    print(f"  Land: {len(land_ids)}, Water: {water_count}")
 
     # Assign only LAND provinces to countries
     assignments = assign_provinces_to_countries(
-        land_provinces, map_width, map_height, hex_size, unowned_ratio
+        land_ids, map_width, map_height, hex_size, unowned_ratio
     )
 
     # Create output directory
     ownership_dir = output_dir / "history" / "provinces"
     ownership_dir.mkdir(parents=True, exist_ok=True)
 
-    # Count assignments
-    owned_count = sum(1 for v in assignments.values() if v is not None)
-    unowned_land_count = len(land_provinces) - owned_count
+    # Count assignments per owner in a single pass (None = unowned)
+    country_counts = Counter(assignments.values())
+    unowned_land_count = country_counts.pop(None, 0)
+    owned_count = len(land_ids) - unowned_land_count
 
     # Generate minimal province history files in JSON5 format
     # Only for owned LAND provinces - ENGINE just needs owner/controller
-    for prov in land_provinces:
-        pid = prov["id"]
+    for pid, name in zip(land_ids.tolist(), land_names.tolist()):
         owner = assignments.get(pid)
 
         if owner is None:
             continue  # Skip unowned - no file needed
 
-        filename = f"{pid}-{prov['name']}.json5"
-        filepath = ownership_dir / filename
-
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(f"// Province {pid}: {prov['name']}\n")
-            f.write("{\n")
-            f.write(f'  owner: "{owner}",\n')
-            f.write(f'  controller: "{owner}"\n')
-            f.write("}\n")
+        filename = f"{pid}-{name}.json5"
+        body = PROVINCE_HISTORY_TEMPLATE.format(pid=pid, name=name, owner=owner)
+        (ownership_dir / filename).write_text(body, encoding="utf-8")
 
     print(f"\nGenerated province ownership files (JSON5):")
     print(f"  Owned land: {owned_count} provinces")
     print(f"  Unowned land: {unowned_land_count} provinces")
-    print(f"  Water (skipped): {len(water_provinces)} provinces")
+    print(f"  Water (skipped): {water_count} provinces")
     print(f"  Output: {ownership_dir}")
 
     # Print country distribution
     print("\nCountry distribution:")
-    country_counts = {}
-    for owner in assignments.values():
-        if owner:
-            country_counts[owner] = country_counts.get(owner, 0) + 1
-
+    country_names = {t: n for t, n, _ in TEMPLATE_COUNTRIES}
     for tag, count in sorted(country_counts.items(), key=lambda x: -x[1]):
-        name = next((n for t, n, _ in TEMPLATE_COUNTRIES if t == tag), tag)
-        print(f"  {tag} ({name}): {count} provinces")
+        print(f"  {tag} ({country_names.get(tag, tag)}): {count} provinces")
 
 
 def main():
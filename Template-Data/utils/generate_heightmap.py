@@ -12,9 +12,7 @@ Uses Perlin noise to generate natural-looking terrain.
 Height is assigned per-hexagon to match province boundaries.
 """
 
-import math
 import argparse
-import random
 from pathlib import Path
 
 try:
@@ -23,107 +21,57 @@ except ImportError:
     print("ERROR: Pillow not installed. Run: pip install Pillow")
     exit(1)
 
+try:
+    import numpy as np
+except ImportError:
+    print("ERROR: NumPy not installed. Run: pip install numpy")
+    exit(1)
+
+from hexgrid import draw_hexagons, grid_layout, hex_centers
+from perlin import PerlinNoise
 
-# Perlin noise implementation (no external dependencies)
-class PerlinNoise:
-    """Simple Perlin noise generator."""
-
-    def __init__(self, seed: int = 0):
-        self.seed = seed
-        random.seed(seed)
-        # Permutation table
-        self.p = list(range(256))
-        random.shuffle(self.p)
-        self.p = self.p + self.p  # Duplicate for overflow
-
-    def _fade(self, t: float) -> float:
-        """Smoothstep function."""
-        return t * t * t * (t * (t * 6 - 15) + 10)
-
-    def _lerp(self, a: float, b: float, t: float) -> float:
-        """Linear interpolation."""
-        return a + t * (b - a)
-
-    def _grad(self, hash_val: int, x: float, y: float) -> float:
-        """Gradient function."""
-        h = hash_val & 3
-        if h == 0:
-            return x + y
-        elif h == 1:
-            return -x + y
-        elif h == 2:
-            return x - y
-        else:
-            return -x - y
-
-    def noise2d(self, x: float, y: float) -> float:
-        """
-        Generate 2D Perlin noise value.
-        Returns value in range [-1, 1].
-        """
-        # Grid cell coordinates
-        xi = int(math.floor(x)) & 255
-        yi = int(math.floor(y)) & 255
-
-        # Relative position in cell
-        xf = x - math.floor(x)
-        yf = y - math.floor(y)
-
-        # Fade curves
-        u = self._fade(xf)
-        v = self._fade(yf)
-
-        # Hash coordinates of corners
-        aa = self.p[self.p[xi] + yi]
-        ab = self.p[self.p[xi] + yi + 1]
-        ba = self.p[self.p[xi + 1] + yi]
-        bb = self.p[self.p[xi + 1] + yi + 1]
-
-        # Blend gradients
-        x1 = self._lerp(self._grad(aa, xf, yf), self._grad(ba, xf - 1, yf), u)
-        x2 = self._lerp(self._grad(ab, xf, yf - 1), self._grad(bb, xf - 1, yf - 1), u)
-
-        return self._lerp(x1, x2, v)
-
-    def octave_noise(self, x: float, y: float, octaves: int = 6,
-                     persistence: float = 0.5, lacunarity: float = 2.0) -> float:
-        """
-        Generate fractal noise by combining multiple octaves.
-        Returns value in range approximately [-1, 1].
-        """
-        total = 0.0
-        amplitude = 1.0
-        frequency = 1.0
-        max_value = 0.0
-
-        for _ in range(octaves):
-            total += self.noise2d(x * frequency, y * frequency) * amplitude
-            max_value += amplitude
-            amplitude *= persistence
-            frequency *= lacunarity
-
-        return total / max_value
-
-
-def smooth_falloff(x: float, edge0: float, edge1: float) -> float:
+# Continent shape: distance from the vertical center line where land fades out
+CONTINENT_FALLOFF_START = 0.3
+CONTINENT_FALLOFF_END = 0.6
+
+
+def smooth_falloff(x: np.ndarray, edge0: float, edge1: float) -> np.ndarray:
     """Smoothstep falloff function. Returns 0 when x < edge0, 1 when x > edge1."""
-    if x <= edge0:
-        return 0.0
-    if x >= edge1:
-        return 1.0
-    t = (x - edge0) / (edge1 - edge0)
+    t = np.clip((x - edge0) / (edge1 - edge0), 0.0, 1.0)
     return t * t * (3 - 2 * t)
 
 
-def draw_hexagon(draw: ImageDraw.Draw, cx: float, cy: float, size: float, color: tuple):
-    """Draw a filled hexagon centered at (cx, cy)."""
-    points = []
-    for i in range(6):
-        angle = math.pi / 3 * i
-        x = cx + size * math.cos(angle)
-        y = cy + size * math.sin(angle)
-        points.append((x, y))
-    draw.polygon(points, fill=color)
+def compute_hex_heights(
+    noise: PerlinNoise,
+    cx: np.ndarray,
+    cy: np.ndarray,
+    width: int,
+    height: int,
+    scale: float,
+    octaves: int
+) -> np.ndarray:
+    """Calculate the raw height value for each hex center."""
+    # Normalize coordinates to noise space
+    nx = cx / width * scale
+    ny = cy / height * scale
+
+    # Generate multi-octave noise for terrain variation
+    values = noise.octave_noise_grid(nx, ny, octaves=octaves)
+
+    # Create vertical continent shape in center
+    # Distance from center horizontal line (0 = center, 1 = edge)
+    horizontal_dist = np.abs(cx / width - 0.5) * 2.0
+
+    # Smooth falloff: land in center, ocean at edges
+    # Use smoothstep for natural coastlines
+    continent_factor = 1.0 - smooth_falloff(horizontal_dist, CONTINENT_FALLOFF_START, CONTINENT_FALLOFF_END)
+
+    # Combine noise with continent shape (in place, no extra temporaries)
+    # High continent_factor = more likely to be land
+    values *= 0.4
+    values += continent_factor * 0.8
+    values -= 0.2
+    return values
 
 
 def generate_heightmap(
@@ -156,105 +104,67 @@ def generate_heightmap(
 
     noise = PerlinNoise(seed)
 
-    # Hexagon spacing (must match province map generator!)
-    hex_width = hex_size * 2
-    hex_height = hex_size * math.sqrt(3)
-    col_spacing = hex_width * 0.75
-    row_spacing = hex_height
-
-    cols = int(width / col_spacing) + 2
-    rows = int(height / row_spacing) + 2
-
+    # Hexagon grid shared with the province and terrain generators
+    cols, rows, _, _ = grid_layout(width, height, hex_size)
     print(f"Generating {cols}x{rows} hexagon grid...")
 
-    # First pass: calculate noise values for each hex center
-    hex_values = []
-    for col in range(cols):
-        for row in range(rows):
-            # Calculate center (must match province generator!)
-            cx = col * col_spacing + hex_size
-            cy = row * row_spacing + hex_height / 2
-            if col % 2 == 1:
-                cy += row_spacing / 2
-
-            # Skip if outside bounds
-            if cx < -hex_size or cx > width + hex_size:
-                continue
-            if cy < -hex_size or cy > height + hex_size:
-                continue
-
-            # Normalize coordinates to noise space
-            nx = cx / width * scale
-            ny = cy / height * scale
-
-            # Generate multi-octave noise for terrain variation
-            value = noise.octave_noise(nx, ny, octaves=octaves)
-
-            # Create vertical continent shape in center
-            # Distance from center horizontal line (0 = center, 1 = edge)
-            horizontal_dist = abs(cx / width - 0.5) * 2.0
-
-            # Smooth falloff: land in center, ocean at edges
-            # Use smoothstep for natural coastlines
-            continent_factor = 1.0 - smooth_falloff(horizontal_dist, 0.3, 0.6)
-
-            # Combine noise with continent shape
-            # High continent_factor = more likely to be land
-            value = value * 0.4 + continent_factor * 0.8 - 0.2
-
-            hex_values.append((cx, cy, value))
+    # First pass: calculate noise values for every hex center at once
+    cx, cy = hex_centers(width, height, hex_size)
+    values = compute_hex_heights(noise, cx, cy, width, height, scale, octaves)
 
     # Find min/max for normalization
-    all_values = [v[2] for v in hex_values]
-    min_val = min(all_values)
-    max_val = max(all_values)
+    min_val = float(values.min())
+    max_val = float(values.max())
 
     print(f"Noise range: [{min_val:.3f}, {max_val:.3f}]")
 
     # Calculate threshold for desired land percentage
-    sorted_values = sorted(all_values)
-    threshold_idx = int(len(sorted_values) * (1 - land_percentage))
-    land_threshold = sorted_values[threshold_idx]
+    # Only one order statistic is needed, so partition instead of a full sort
+    threshold_idx = int(len(values) * (1 - land_percentage))
+    land_threshold = float(np.partition(values, threshold_idx)[threshold_idx])
 
     print(f"Land threshold: {land_threshold:.3f} ({land_percentage*100:.0f}% land)")
 
-    # Create image with ocean as default (below sea level)
-    ocean_gray = sea_level // 2  # Default underwater
-    img = Image.new('RGB', (width, height), (ocean_gray, ocean_gray, ocean_gray))
+    # Map heights to grayscale
+    is_water = values < land_threshold
+
+    # Underwater: map to [0, sea_level-1]
+    underwater_range = land_threshold - min_val
+    if underwater_range > 0:
+        below = (values - min_val) / underwater_range
+    else:
+        below = np.zeros_like(values)
+
+    # Above water: map to [sea_level, 255]
+    above_range = max_val - land_threshold
+    if above_range > 0:
+        above = (values - land_threshold) / above_range
+    else:
+        above = np.zeros_like(values)
+
+    gray_values = np.where(
+        is_water,
+        (below * (sea_level - 1)).astype(np.int32),
+        (sea_level + above * (255 - sea_level)).astype(np.int32)
+    )
+
+    # Clamp to valid range
+    gray_values = np.clip(gray_values, 0, 255)
+
+    # Second pass: draw hexagons
+    # Pixels outside the drawn grid keep the underwater default
+    ocean_gray = sea_level // 2
+    img = Image.new('L', (width, height), ocean_gray)
     draw = ImageDraw.Draw(img)
 
-    # Second pass: draw hexagons with calculated heights
     print("Drawing hexagons...")
-    water_count = 0
-    land_count = 0
-
-    for cx, cy, value in hex_values:
-        if value < land_threshold:
-            # Underwater: map to [0, sea_level-1]
-            underwater_range = land_threshold - min_val
-            if underwater_range > 0:
-                normalized = (value - min_val) / underwater_range
-            else:
-                normalized = 0
-            gray = int(normalized * (sea_level - 1))
-            water_count += 1
-        else:
-            # Above water: map to [sea_level, 255]
-            above_range = max_val - land_threshold
-            if above_range > 0:
-                normalized = (value - land_threshold) / above_range
-            else:
-                normalized = 0
-            gray = int(sea_level + normalized * (255 - sea_level))
-            land_count += 1
-
-        # Clamp to valid range
-        gray = max(0, min(255, gray))
-
-        # Draw hexagon with this height
-        draw_hexagon(draw, cx, cy, hex_size, (gray, gray, gray))
-
-    # Save as PNG
+    draw_hexagons(draw, cx, cy, hex_size, gray_values.tolist())
+
+    water_count = int(is_water.sum())
+    land_count = len(values) - water_count
+
+    # Save as 8-bit grayscale PNG; the engine reads the first channel, so
+    # expanding to RGB would only triple the bytes encoded and written
     heightmap_path = output_dir / "heightmap.png"
     img.save(heightmap_path, "PNG")
     print(f"Saved: {heightmap_path}")
@@ -12,6 +12,7 @@ This is ENGINE layer template data - uses Paradox YAML format.
 """
 
 import argparse
+import csv
 from pathlib import Path
 
 
@@ -29,77 +30,58 @@ TEMPLATE_COUNTRIES = [
     ("GRY", "Gray Union", "Gray"),
 ]
 
+# Escape quotes in names (extend the mapping to escape more characters)
+QUOTE_ESCAPE = str.maketrans({'"': '\\"'})
 
-def load_definition_csv(definition_path: Path) -> list[dict]:
-    """Load province definitions from definition.csv."""
-    provinces = []
 
-    with open(definition_path, "r", encoding="utf-8") as f:
-        header = f.readline()  # Skip header
-
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-
-            parts = line.split(";")
-            if len(parts) >= 5:
-                water_flag = parts[5].strip() if len(parts) > 5 else "x"
-                is_water = water_flag != "x"
+def load_definition_csv(definition_path: Path) -> list[tuple[int, str, bool]]:
+    """Load province definitions from definition.csv as (id, name, is_water) rows."""
+    with open(definition_path, "r", encoding="utf-8", newline="") as f:
+        f.readline()  # Skip header
+        return [
+            # Water flag: 'x' = land, empty = water
+            (int(row[0]), row[4], len(row) > 5 and row[5].strip() != "x")
+            for row in csv.reader(f, delimiter=";", quoting=csv.QUOTE_NONE)
+            if len(row) >= 5
+        ]
 
-                provinces.append({
-                    "id": int(parts[0]),
-                    "name": parts[4] if len(parts) > 4 else f"Province_{parts[0]}",
-                    "is_water": is_water
-                })
 
-    return provinces
+def format_province_entries(definition_path: Path) -> list[str]:
+    """Format one province name entry per definition.csv row (same for every language)."""
+    return [
+        f' PROV{pid}:0 "{name.translate(QUOTE_ESCAPE)}"\n'
+        for pid, name, _ in load_definition_csv(definition_path)
+    ]
 
 
-def generate_province_localisation(output_dir: Path, definition_path: Path, language: str) -> None:
+def generate_province_localisation(loc_dir: Path, province_entries: list[str], language: str) -> None:
     """Generate province name localization file."""
-    provinces = load_definition_csv(definition_path)
-
-    loc_dir = output_dir / "localisation" / language
-    loc_dir.mkdir(parents=True, exist_ok=True)
-
     filepath = loc_dir / f"provinces_l_{language}.yml"
 
+    # Build the whole file in memory and write it once
     with open(filepath, "w", encoding="utf-8-sig") as f:  # UTF-8 BOM for Paradox compatibility
-        f.write(f"l_{language}:\n")
+        f.write(f"l_{language}:\n" + "".join(province_entries))
 
-        for prov in provinces:
-            pid = prov["id"]
-            name = prov["name"]
-            # Escape quotes in names
-            name_escaped = name.replace('"', '\\"')
-            f.write(f' PROV{pid}:0 "{name_escaped}"\n')
+    print(f"Generated: {filepath} ({len(province_entries)} provinces)")
 
-    print(f"Generated: {filepath} ({len(provinces)} provinces)")
 
-
-def generate_country_localisation(output_dir: Path, language: str) -> None:
+def generate_country_localisation(loc_dir: Path, language: str) -> None:
     """Generate country name localization file."""
-    loc_dir = output_dir / "localisation" / language
-    loc_dir.mkdir(parents=True, exist_ok=True)
-
     filepath = loc_dir / f"countries_l_{language}.yml"
 
-    with open(filepath, "w", encoding="utf-8-sig") as f:  # UTF-8 BOM for Paradox compatibility
-        f.write(f"l_{language}:\n")
+    lines = [f"l_{language}:\n"]
+    for tag, name, adjective in TEMPLATE_COUNTRIES:
+        lines.append(f' {tag}:0 "{name}"\n')
+        lines.append(f' {tag}_ADJ:0 "{adjective}"\n')
 
-        for tag, name, adjective in TEMPLATE_COUNTRIES:
-            f.write(f' {tag}:0 "{name}"\n')
-            f.write(f' {tag}_ADJ:0 "{adjective}"\n')
+    with open(filepath, "w", encoding="utf-8-sig") as f:  # UTF-8 BOM for Paradox compatibility
+        f.write("".join(lines))
 
     print(f"Generated: {filepath} ({len(TEMPLATE_COUNTRIES)} countries)")
 
 
-def generate_terrain_localisation(output_dir: Path, language: str) -> None:
+def generate_terrain_localisation(loc_dir: Path, language: str) -> None:
     """Generate terrain type localization file."""
-    loc_dir = output_dir / "localisation" / language
-    loc_dir.mkdir(parents=True, exist_ok=True)
-
     filepath = loc_dir / f"terrain_l_{language}.yml"
 
     # Standard terrain types
@@ -117,11 +99,11 @@ def generate_terrain_localisation(output_dir: Path, language: str) -> None:
         ("coastal_sea", "Coastal Sea"),
     ]
 
-    with open(filepath, "w", encoding="utf-8-sig") as f:
-        f.write(f"l_{language}:\n")
+    lines = [f"l_{language}:\n"]
+    lines.extend(f' TERRAIN_{terrain_key}:0 "{terrain_name}"\n' for terrain_key, terrain_name in terrain_types)
 
-        for terrain_key, terrain_name in terrain_types:
-            f.write(f' TERRAIN_{terrain_key}:0 "{terrain_name}"\n')
+    with open(filepath, "w", encoding="utf-8-sig") as f:
+        f.write("".join(lines))
 
     print(f"Generated: {filepath} ({len(terrain_types)} terrain types)")
 
@@ -170,23 +152,31 @@ def main():
             "polish",
         ]
 
+    # Province names don't depend on the language - read and format them once
+    definition_path = Path(args.definition) if args.definition else None
+    province_entries = None
+    if definition_path and definition_path.exists():
+        province_entries = format_province_entries(definition_path)
+
     for lang in languages:
         print(f"\nGenerating {lang} localisation:")
 
+        # One directory per language, shared by all of its files
+        loc_dir = output_dir / "localisation" / lang
+        loc_dir.mkdir(parents=True, exist_ok=True)
+
         # Generate country names
-        generate_country_localisation(output_dir, lang)
+        generate_country_localisation(loc_dir, lang)
 
         # Generate terrain names
-        generate_terrain_localisation(output_dir, lang)
+        generate_terrain_localisation(loc_dir, lang)
 
         # Generate province names if definition.csv provided
-        if args.definition:
-            definition_path = Path(args.definition)
-            if definition_path.exists():
-                generate_province_localisation(output_dir, definition_path, lang)
-            else:
-                print(f"  Warning: definition.csv not found at {definition_path}")
-                print("  Skipping province localisation generation.")
+        if province_entries is not None:
+            generate_province_localisation(loc_dir, province_entries, lang)
+        elif definition_path:
+            print(f"  Warning: definition.csv not found at {definition_path}")
+            print("  Skipping province localisation generation.")
         else:
             print("  Note: No --definition provided, skipping province localisation.")
 
@@ -12,7 +12,6 @@ Output format matches Assets/Data/map/definition.csv:
     2;135;8;144;Province_2;       (empty = water)
 """
 
-import math
 import argparse
 from pathlib import Path
 
@@ -22,6 +21,14 @@ except ImportError:
     print("ERROR: Pillow not installed. Run: pip install Pillow")
     exit(1)
 
+try:
+    import numpy as np
+except ImportError:
+    print("ERROR: NumPy not installed. Run: pip install numpy")
+    exit(1)
+
+from hexgrid import draw_hexagons, grid_layout, hex_centers
+
 
 # Water terrain colors from terrain_rgb.json5
 WATER_COLORS = [
@@ -32,107 +39,103 @@ WATER_COLORS = [
 # Tolerance for color matching (terrain.bmp may have slight variations)
 COLOR_TOLERANCE = 10
 
+# zlib level for provinces.png - flat hex fills compress well at low levels,
+# and level 4 encodes faster than the default 6 at about the same size
+PNG_COMPRESS_LEVEL = 4
+
 
-def is_water_color(r: int, g: int, b: int) -> bool:
-    """Check if RGB color matches any water terrain type."""
-    for wr, wg, wb in WATER_COLORS:
-        if (abs(r - wr) <= COLOR_TOLERANCE and
-            abs(g - wg) <= COLOR_TOLERANCE and
-            abs(b - wb) <= COLOR_TOLERANCE):
-            return True
-    return False
+def is_water_color(colors: np.ndarray) -> np.ndarray:
+    """Check which RGB colors (array (N, 3)) match any water terrain type."""
+    water = np.array(WATER_COLORS, dtype=np.uint8)[None, :, :]
+    colors = colors[:, None, :]
+    # max - min is the absolute difference without leaving uint8
+    diff = np.maximum(colors, water) - np.minimum(colors, water)
+    return (diff <= COLOR_TOLERANCE).all(axis=-1).any(axis=-1)
 
 
-def generate_unique_rgb(province_id: int, is_water: bool = False) -> tuple[int, int, int]:
+def build_rgb_lut(province_ids: np.ndarray, is_water: np.ndarray) -> np.ndarray:
     """
-    Generate a unique RGB color for a province ID.
+    Generate a unique RGB color for each province ID.
     Encodes province ID directly into RGB channels for guaranteed uniqueness.
     Supports up to 16,777,215 provinces (24-bit RGB).
     Avoids black (0,0,0) which is typically reserved for "no province".
 
     Water provinces use blue-dominant colors, land uses varied colors.
+    Returns array (N, 3) of uint8 colors, one row per province ID.
     """
-    if province_id == 0:
-        return (0, 0, 0)  # Reserved for "no province" / borders
-
-    if is_water:
-        # Water provinces: blue-dominant colors
-        # Use province ID to create variation within blue range
-        # R: 0-80, G: 0-120, B: 150-255
-        r = (province_id * 17) % 80
-        g = (province_id * 31) % 120
-        b = 150 + (province_id * 7) % 106  # 150-255 range
-    else:
-        # Land provinces: spread across warm/earth tones
-        # Avoid pure blue to distinguish from water
-        # Use golden ratio-based distribution for visual variety
-        golden = 0.618033988749895
-        hue = (province_id * golden) % 1.0
-
-        # Convert hue to RGB (simplified HSV with S=0.6, V=0.9)
-        # Bias toward warm colors (reds, oranges, yellows, greens)
-        hue = hue * 0.75  # Limit to 0-270 degrees (avoid pure blue)
-
-        if hue < 0.166:  # Red
-            r = 230
-            g = int(80 + hue * 6 * 100)
-            b = int(50 + (province_id % 50))
-        elif hue < 0.333:  # Orange/Yellow
-            r = int(200 + (province_id % 55))
-            g = int(150 + (hue - 0.166) * 6 * 80)
-            b = int(40 + (province_id % 60))
-        elif hue < 0.5:  # Yellow/Green
-            r = int(150 + (province_id % 80))
-            g = int(180 + (province_id % 70))
-            b = int(50 + (province_id % 50))
-        elif hue < 0.666:  # Green
-            r = int(60 + (province_id % 80))
-            g = int(160 + (province_id % 80))
-            b = int(60 + (province_id % 70))
-        else:  # Cyan/Teal (avoid pure blue)
-            r = int(60 + (province_id % 70))
-            g = int(140 + (province_id % 80))
-            b = int(120 + (province_id % 60))
-
-        # Ensure uniqueness by encoding province ID in least significant bits
-        # This preserves visual color while guaranteeing uniqueness
-        r = (r & 0xF0) | (province_id & 0x0F)
-        g = (g & 0xF0) | ((province_id >> 4) & 0x0F)
-        b = (b & 0xF0) | ((province_id >> 8) & 0x0F)
+    ids = np.asarray(province_ids, dtype=np.int64)
+    is_water = np.asarray(is_water, dtype=bool)
+
+    # Land provinces: spread across warm/earth tones
+    # Avoid pure blue to distinguish from water
+    # Use golden ratio-based distribution for visual variety
+    golden = 0.618033988749895
+    hue = (ids * golden) % 1.0
+
+    # Convert hue to RGB (simplified HSV with S=0.6, V=0.9)
+    # Bias toward warm colors (reds, oranges, yellows, greens)
+    hue = hue * 0.75  # Limit to 0-270 degrees (avoid pure blue)
+
+    buckets = [
+        hue < 0.166,  # Red
+        hue < 0.333,  # Orange/Yellow
+        hue < 0.5,    # Yellow/Green
+        hue < 0.666,  # Green
+    ]
+    # Cyan/Teal (avoid pure blue) is the default
+    r = np.select(buckets, [
+        np.full_like(ids, 230),
+        200 + ids % 55,
+        150 + ids % 80,
+        60 + ids % 80,
+    ], 60 + ids % 70)
+    g = np.select(buckets, [
+        (80 + hue * 6 * 100).astype(np.int64),
+        (150 + (hue - 0.166) * 6 * 80).astype(np.int64),
+        180 + ids % 70,
+        160 + ids % 80,
+    ], 140 + ids % 80)
+    b = np.select(buckets, [
+        50 + ids % 50,
+        40 + ids % 60,
+        50 + ids % 50,
+        60 + ids % 70,
+    ], 120 + ids % 60)
+
+    # Ensure uniqueness by encoding province ID in least significant bits
+    # This preserves visual color while guaranteeing uniqueness
+    r = (r & 0xF0) | (ids & 0x0F)
+    g = (g & 0xF0) | ((ids >> 4) & 0x0F)
+    b = (b & 0xF0) | ((ids >> 8) & 0x0F)
+
+    # Water provinces: blue-dominant colors
+    # Use province ID to create variation within blue range
+    # R: 0-80, G: 0-120, B: 150-255
+    r = np.where(is_water, (ids * 17) % 80, r)
+    g = np.where(is_water, (ids * 31) % 120, g)
+    b = np.where(is_water, 150 + (ids * 7) % 106, b)  # 150-255 range
 
     # Clamp to valid range
-    r = max(1, min(255, r))  # Avoid 0 to prevent black
-    g = max(0, min(255, g))
-    b = max(0, min(255, b))
+    r = np.clip(r, 1, 255)  # Avoid 0 to prevent black
+    g = np.clip(g, 0, 255)
+    b = np.clip(b, 0, 255)
 
     # Final uniqueness guarantee: if collision possible, encode directly
     # For provinces > 4096, fall back to direct encoding with color bias
-    if province_id > 4096:
-        if is_water:
-            r = (province_id & 0x3F)  # 0-63
-            g = ((province_id >> 6) & 0x3F) + 30  # 30-93
-            b = 180 + ((province_id >> 12) & 0x4F)  # 180-255
-        else:
-            r = 100 + (province_id & 0x7F)  # 100-227
-            g = 80 + ((province_id >> 7) & 0x7F)  # 80-207
-            b = ((province_id >> 14) & 0x3F)  # 0-63
-
-    return (r, g, b)
-
-
-def draw_hexagon(draw: ImageDraw.Draw, cx: float, cy: float, size: float, color: tuple):
-    """
-    Draw a filled hexagon centered at (cx, cy) with given size.
-    Flat-top hexagon orientation.
-    """
-    points = []
-    for i in range(6):
-        angle = math.pi / 3 * i  # 60 degrees per vertex
-        x = cx + size * math.cos(angle)
-        y = cy + size * math.sin(angle)
-        points.append((x, y))
-
-    draw.polygon(points, fill=color)
+    large = ids > 4096
+    r = np.where(large, np.where(is_water,
+                                 ids & 0x3F,                 # 0-63
+                                 100 + (ids & 0x7F)), r)     # 100-227
+    g = np.where(large, np.where(is_water,
+                                 ((ids >> 6) & 0x3F) + 30,   # 30-93
+                                 80 + ((ids >> 7) & 0x7F)), g)  # 80-207
+    b = np.where(large, np.where(is_water,
+                                 180 + ((ids >> 12) & 0x4F),  # 180-255
+                                 (ids >> 14) & 0x3F), b)      # 0-63
+
+    rgb = np.stack([r, g, b], axis=1).astype(np.uint8)
+    rgb[ids == 0] = 0  # Reserved for "no province" / borders
+    return rgb
 
 
 def generate_hexagon_grid(
@@ -165,102 +168,63 @@ def generate_hexagon_grid(
     else:
         print("No terrain image provided - all provinces will be marked as land")
 
-    # Create image with black background (0,0,0 = no province)
-    img = Image.new('RGB', (width, height), (0, 0, 0))
-    draw = ImageDraw.Draw(img)
+    # Flat-top hexagon grid shared with the heightmap and terrain generators
+    cols, rows, col_spacing, row_spacing = grid_layout(width, height, hex_size)
 
-    # Hexagon spacing for flat-top orientation
-    hex_width = hex_size * 2
-    hex_height = hex_size * math.sqrt(3)
-
-    # Horizontal and vertical spacing
-    col_spacing = hex_width * 0.75  # 3/4 of hex width for overlap
-    row_spacing = hex_height
+    print(f"Generating {cols}x{rows} hexagon grid...")
+    print(f"Hex size: {hex_size}px, spacing: {col_spacing:.1f}x{row_spacing:.1f}")
 
-    provinces = []
-    province_id = start_id
+    # Calculate every center position at once
+    cx, cy = hex_centers(width, height, hex_size)
+    province_ids = np.arange(start_id, start_id + len(cx))
+
+    # Check which provinces are water FIRST (sample terrain at hex centers)
+    if terrain_img:
+        terrain = np.asarray(terrain_img)
+        # Clamp coordinates to terrain image bounds
+        tx = np.clip(cx, 0, terrain_img.width - 1).astype(np.intp)
+        ty = np.clip(cy, 0, terrain_img.height - 1).astype(np.intp)
+        is_water = is_water_color(terrain[ty, tx])
+    else:
+        is_water = np.zeros(len(cx), dtype=bool)
 
-    # Calculate grid dimensions
-    cols = int(width / col_spacing) + 2
-    rows = int(height / row_spacing) + 2
+    # Generate unique colors (blue for water, warm colors for land)
+    province_rgb = build_rgb_lut(province_ids, is_water)
 
-    print(f"Generating {cols}x{rows} hexagon grid...")
-    print(f"Hex size: {hex_size}px, spacing: {col_spacing:.1f}x{row_spacing:.1f}")
+    # Create image with black background (0,0,0 = no province)
+    img = Image.new('RGB', (width, height), (0, 0, 0))
+    draw = ImageDraw.Draw(img)
 
-    for col in range(cols):
-        for row in range(rows):
-            # Calculate center position
-            cx = col * col_spacing + hex_size
-
-            # Offset every other column
-            cy = row * row_spacing + hex_height / 2
-            if col % 2 == 1:
-                cy += row_spacing / 2
-
-            # Skip if center is outside image bounds (with margin)
-            if cx < -hex_size or cx > width + hex_size:
-                continue
-            if cy < -hex_size or cy > height + hex_size:
-                continue
-
-            # Check if this province is water FIRST (sample terrain at hex center)
-            is_water = False
-            if terrain_img:
-                # Clamp coordinates to terrain image bounds
-                tx = int(min(max(cx, 0), terrain_img.width - 1))
-                ty = int(min(max(cy, 0), terrain_img.height - 1))
-                terrain_color = terrain_img.getpixel((tx, ty))
-                is_water = is_water_color(terrain_color[0], terrain_color[1], terrain_color[2])
-
-            # Generate unique color (blue for water, warm colors for land)
-            rgb = generate_unique_rgb(province_id, is_water)
-
-            # Draw hexagon
-            draw_hexagon(draw, cx, cy, hex_size, rgb)
-
-            # Store province data
-            provinces.append({
-                'id': province_id,
-                'r': rgb[0],
-                'g': rgb[1],
-                'b': rgb[2],
-                'name': f"Province_{province_id}",
-                'cx': cx,
-                'cy': cy,
-                'is_water': is_water
-            })
-
-            province_id += 1
+    # Draw hexagons
+    draw_hexagons(draw, cx, cy, hex_size, map(tuple, province_rgb.tolist()))
 
     # Save province map
     provinces_path = output_dir / "provinces.png"
-    img.save(provinces_path)
+    img.save(provinces_path, compress_level=PNG_COMPRESS_LEVEL)
     print(f"Saved: {provinces_path}")
 
     # Save definition.csv
+    # Format: province;red;green;blue;name;water_flag
+    # water_flag: 'x' = land, empty = water
     definition_path = output_dir / "definition.csv"
-    water_count = 0
-    land_count = 0
+    # Province data lives in parallel arrays; names are implicit
+    lines = [
+        f"{province_id};{r};{g};{b};Province_{province_id};{'' if water else 'x'}\n"
+        for province_id, (r, g, b), water in zip(
+            province_ids.tolist(), province_rgb.tolist(), is_water.tolist()
+        )
+    ]
+    water_count = int(is_water.sum())
+    land_count = len(province_ids) - water_count
 
     with open(definition_path, 'w', encoding='utf-8') as f:
-        # Header matching game format
-        f.write("province;red;green;blue;name;x\n")
-
-        for prov in provinces:
-            # Format: province;red;green;blue;name;water_flag
-            # water_flag: 'x' = land, empty = water
-            water_flag = "" if prov.get('is_water', False) else "x"
-            f.write(f"{prov['id']};{prov['r']};{prov['g']};{prov['b']};{prov['name']};{water_flag}\n")
-
-            if prov.get('is_water', False):
-                water_count += 1
-            else:
-                land_count += 1
+        # Header matching game format, then all rows in a single write
+        f.write("province;red;green;blue;name;x\n" + "".join(lines))
 
     print(f"Saved: {definition_path}")
-    print(f"Total provinces: {len(provinces)} (Land: {land_count}, Water: {water_count})")
+    print(f"Total provinces: {len(province_ids)} (Land: {land_count}, Water: {water_count})")
 
-    return len(provinces)
+    return len(province_ids)
 
 
 def main():
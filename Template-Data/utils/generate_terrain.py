@@ -9,10 +9,7 @@ Reads terrain definitions from terrain.json5 (single source of truth).
 RGB colors must match terrain.json5 exactly for the shader to work.
 """
 
-import math
 import argparse
-import random
-import re
 import json
 from pathlib import Path
 
@@ -22,10 +19,87 @@ except ImportError:
     print("ERROR: Pillow not installed. Run: pip install Pillow")
     exit(1)
 
+try:
+    import numpy as np
+except ImportError:
+    print("ERROR: NumPy not installed. Run: pip install numpy")
+    exit(1)
+
+from hexgrid import draw_hexagons, grid_layout, hex_centers
+from perlin import PerlinNoise
+
 
 # Terrain colors loaded from terrain.json5
 TERRAIN_COLORS = {}  # name -> (r, g, b)
 
+# Terrain types the classifier can produce; the position is the terrain id
+TERRAIN_NAMES = (
+    "ocean", "inland_ocean", "grasslands", "plains", "hills", "highlands",
+    "mountain", "desert_mountain", "snow", "desert", "coastal_desert",
+    "savannah", "forest", "jungle", "marsh",
+)
+TERRAIN_IDS = {name: i for i, name in enumerate(TERRAIN_NAMES)}
+
+# zlib level for terrain.png - the few terrain colors repeat in long runs,
+# so 4 already matches the default level's size
+PNG_COMPRESS_LEVEL = 4
+
+
+def json5_to_json(text: str) -> str:
+    """
+    Convert JSON5 text to standard JSON in a single pass.
+    Strips // and /* */ comments, quotes unquoted keys and drops trailing
+    commas. String contents are copied untouched.
+    """
+    out = []
+    i = 0
+    n = len(text)
+
+    while i < n:
+        c = text[i]
+
+        if c == '"':
+            # Copy the whole string, skipping over escaped characters
+            j = i + 1
+            while j < n and text[j] != '"':
+                j += 2 if text[j] == '\\' else 1
+            out.append(text[i:j + 1])
+            i = j + 1
+        elif text.startswith("//", i):
+            # Keep the newline so JSON error line numbers stay right
+            j = text.find("\n", i)
+            i = n if j < 0 else j
+        elif text.startswith("/*", i):
+            j = text.find("*/", i + 2)
+            end = n if j < 0 else j + 2
+            if "\n" in text[i:end]:
+                out.append("\n" * text.count("\n", i, end))
+            i = end
+        elif c.isalpha() or c in "_$":
+            # Bare word: a key if a colon follows, otherwise true/false/null
+            # or the tail of a number like 1e5
+            j = i + 1
+            while j < n and (text[j].isalnum() or text[j] in "_$"):
+                j += 1
+            k = j
+            while k < n and text[k].isspace():
+                k += 1
+            word = text[i:j]
+            out.append(f'"{word}"' if k < n and text[k] == ":" else word)
+            i = j
+        else:
+            if c in "}]":
+                # Drop a trailing comma before the closing bracket
+                k = len(out) - 1
+                while k >= 0 and out[k].isspace():
+                    k -= 1
+                if k >= 0 and out[k] == ",":
+                    del out[k]
+            out.append(c)
+            i += 1
+
+    return "".join(out)
+
 
 def load_terrain_colors(terrain_json5_path: Path) -> dict:
     """
@@ -39,18 +113,8 @@ def load_terrain_colors(terrain_json5_path: Path) -> dict:
 
     content = terrain_json5_path.read_text(encoding='utf-8')
 
-    # Strip comments (// style)
-    content = re.sub(r'//.*$', '', content, flags=re.MULTILINE)
-
-    # Convert JSON5 unquoted keys to quoted keys for standard JSON parsing
-    # Match word characters followed by colon (but not inside strings)
-    content = re.sub(r'(\s)(\w+)(\s*:)', r'\1"\2"\3', content)
-
-    # Remove trailing commas before } or ]
-    content = re.sub(r',(\s*[}\]])', r'\1', content)
-
     try:
-        data = json.loads(content)
+        data = json.loads(json5_to_json(content))
     except json.JSONDecodeError as e:
         print(f"ERROR: Failed to parse terrain.json5: {e}")
         print("Using default colors...")
@@ -88,76 +152,37 @@ def get_default_terrain_colors() -> dict:
     }
 
 
-class PerlinNoise:
-    """Simple Perlin noise for terrain variation."""
-
-    def __init__(self, seed: int = 0):
-        self.seed = seed
-        random.seed(seed)
-        self.p = list(range(256))
-        random.shuffle(self.p)
-        self.p = self.p + self.p
-
-    def _fade(self, t: float) -> float:
-        return t * t * t * (t * (t * 6 - 15) + 10)
-
-    def _lerp(self, a: float, b: float, t: float) -> float:
-        return a + t * (b - a)
-
-    def _grad(self, hash_val: int, x: float, y: float) -> float:
-        h = hash_val & 3
-        if h == 0:
-            return x + y
-        elif h == 1:
-            return -x + y
-        elif h == 2:
-            return x - y
-        else:
-            return -x - y
-
-    def noise2d(self, x: float, y: float) -> float:
-        xi = int(math.floor(x)) & 255
-        yi = int(math.floor(y)) & 255
-        xf = x - math.floor(x)
-        yf = y - math.floor(y)
-        u = self._fade(xf)
-        v = self._fade(yf)
-        aa = self.p[self.p[xi] + yi]
-        ab = self.p[self.p[xi] + yi + 1]
-        ba = self.p[self.p[xi + 1] + yi]
-        bb = self.p[self.p[xi + 1] + yi + 1]
-        x1 = self._lerp(self._grad(aa, xf, yf), self._grad(ba, xf - 1, yf), u)
-        x2 = self._lerp(self._grad(ab, xf, yf - 1), self._grad(bb, xf - 1, yf - 1), u)
-        return self._lerp(x1, x2, v)
-
-
-def get_terrain_rgb(terrain_name: str) -> tuple[int, int, int]:
-    """Get RGB color for a terrain type from loaded colors."""
+def build_terrain_rgb_table() -> np.ndarray:
+    """
+    Get RGB colors for all terrain types from loaded colors.
+    Returns array (len(TERRAIN_NAMES), 3) of uint8, indexed by terrain id.
+    """
     global TERRAIN_COLORS
-    if terrain_name in TERRAIN_COLORS:
-        return TERRAIN_COLORS[terrain_name]
     # Fallback to grasslands or first available
     if "grasslands" in TERRAIN_COLORS:
-        return TERRAIN_COLORS["grasslands"]
-    if TERRAIN_COLORS:
-        return next(iter(TERRAIN_COLORS.values()))
-    return (86, 124, 27)  # Default grasslands
+        fallback = TERRAIN_COLORS["grasslands"]
+    elif TERRAIN_COLORS:
+        fallback = next(iter(TERRAIN_COLORS.values()))
+    else:
+        fallback = (86, 124, 27)  # Default grasslands
+
+    return np.array(
+        [TERRAIN_COLORS.get(name, fallback) for name in TERRAIN_NAMES],
+        dtype=np.uint8
+    )
 
 
-def determine_terrain_for_hex(
-    height: int,
-    cx: float,
-    cy: float,
+def compute_biome_fields(
+    noise: PerlinNoise,
+    cx: np.ndarray,
+    cy: np.ndarray,
     width: int,
     img_height: int,
-    noise: PerlinNoise,
-    sea_level: int = 94
-) -> str:
+    octaves: int = 1
+) -> tuple[np.ndarray, np.ndarray]:
     """
-    Determine terrain type for a hexagon based on height at center.
-    Valid terrain types: grasslands, hills, desert_mountain, desert, plains,
-    mountain, marsh, forest, ocean, snow, inland_ocean, coastal_desert,
-    savannah, highlands, jungle
+    Calculate moisture and temperature (both 0-1) for every hex center at once.
+    More octaves add finer detail to the biome borders.
 
     For vertical continent: top = cold/snow, middle = temperate, bottom = hot/desert
     """
@@ -166,113 +191,97 @@ def determine_terrain_for_hex(
     ny = cy / img_height * 8.0
 
     # Get noise values for biome variation
-    moisture = (noise.noise2d(nx * 2, ny * 2) + 1) / 2
+    moisture = (noise.octave_noise_grid(nx * 2, ny * 2, octaves) + 1) / 2
 
     # Latitude-based temperature: top of map = cold (0), bottom = hot (1)
     # Use y position directly for clear north-south gradient
     base_temperature = cy / img_height  # 0 at top, 1 at bottom
 
     # Add some noise variation but keep the gradient dominant
-    temp_noise = (noise.noise2d(nx * 1.5 + 100, ny * 1.5 + 100) + 1) / 2
+    temp_noise = (noise.octave_noise_grid(nx * 1.5 + 100, ny * 1.5 + 100, octaves) + 1) / 2
     temperature = base_temperature * 0.8 + temp_noise * 0.2
 
-    # Ocean
-    if height < sea_level - 5:
-        return "ocean"
+    return moisture, temperature
 
-    # Coastal areas (just above sea level)
-    if height < sea_level + 5:
-        if moisture > 0.65:
-            return "marsh"
-        if temperature > 0.75:
-            return "coastal_desert"
-        return "plains"
 
-    # Inland water (lakes in wet areas)
-    if height < sea_level + 8 and moisture > 0.85:
-        return "inland_ocean"
+def classify_terrain(
+    heights: np.ndarray,
+    moisture: np.ndarray,
+    temperature: np.ndarray,
+    sea_level: int = 94
+) -> np.ndarray:
+    """
+    Determine terrain type for every hexagon based on height at its center.
+    Returns array of terrain ids (indices into TERRAIN_NAMES).
+
+    Rules are checked in order and the first match wins; every elevation
+    tier ends with a catch-all, so later tiers only see what is left over.
+    """
+    height = np.asarray(heights, dtype=np.int32)
+    m = moisture
+    t = temperature
 
     # Normalized land height
     land_height = (height - sea_level) / (255 - sea_level)
 
-    # High mountains and snow (elevation > 0.7)
-    if land_height > 0.7:
-        if temperature < 0.35:
-            return "snow"
-        if temperature > 0.7 and moisture < 0.35:
-            return "desert_mountain"
-        return "mountain"
-
-    # Mountains (elevation 0.5-0.7)
-    if land_height > 0.5:
-        if temperature < 0.25:
-            return "snow"
-        if temperature > 0.65 and moisture < 0.35:
-            return "desert_mountain"
-        return "mountain"
-
-    # Highlands/hills (elevation 0.3-0.5)
-    if land_height > 0.3:
-        if temperature < 0.3:
-            if moisture > 0.5:
-                return "forest"
-            return "highlands"
-        if temperature > 0.7:
-            if moisture < 0.3:
-                return "desert"
-            return "savannah"
-        if moisture > 0.65:
-            return "forest"
-        if moisture < 0.35:
-            return "highlands"
-        return "hills"
-
-    # Mid-elevation (0.15-0.3)
-    if land_height > 0.15:
-        if temperature < 0.25:
-            return "forest"  # Cold forest (taiga-like)
-        if temperature > 0.75:
-            if moisture < 0.3:
-                return "desert"
-            if moisture > 0.7:
-                return "jungle"
-            return "savannah"
-        if moisture > 0.7:
-            if temperature > 0.6:
-                return "jungle"
-            return "forest"
-        if moisture > 0.5:
-            return "grasslands"
-        return "plains"
-
-    # Low elevation (< 0.15)
-    if temperature < 0.3:
-        if moisture > 0.6:
-            return "marsh"
-        return "grasslands"
-    if temperature > 0.7:
-        if moisture < 0.35:
-            return "coastal_desert"
-        if moisture > 0.7:
-            return "jungle"
-        return "savannah"
-    if moisture > 0.65:
-        return "marsh"
-    if moisture > 0.45:
-        return "grasslands"
-
-    return "plains"
-
-
-def draw_hexagon(draw: ImageDraw.Draw, cx: float, cy: float, size: float, color: tuple):
-    """Draw a filled hexagon centered at (cx, cy)."""
-    points = []
-    for i in range(6):
-        angle = math.pi / 3 * i
-        x = cx + size * math.cos(angle)
-        y = cy + size * math.sin(angle)
-        points.append((x, y))
-    draw.polygon(points, fill=color)
+    coastal = height < sea_level + 5             # Just above sea level
+    peaks = land_height > 0.7                    # High mountains and snow
+    mountains = land_height > 0.5                # 0.5-0.7
+    uplands = land_height > 0.3                  # Highlands/hills, 0.3-0.5
+    midlands = land_height > 0.15                # 0.15-0.3
+
+    rules = [
+        # Ocean
+        (height < sea_level - 5, "ocean"),
+
+        # Coastal areas
+        (coastal & (m > 0.65), "marsh"),
+        (coastal & (t > 0.75), "coastal_desert"),
+        (coastal, "plains"),
+
+        # Inland water (lakes in wet areas)
+        ((height < sea_level + 8) & (m > 0.85), "inland_ocean"),
+
+        (peaks & (t < 0.35), "snow"),
+        (peaks & (t > 0.7) & (m < 0.35), "desert_mountain"),
+        (peaks, "mountain"),
+
+        (mountains & (t < 0.25), "snow"),
+        (mountains & (t > 0.65) & (m < 0.35), "desert_mountain"),
+        (mountains, "mountain"),
+
+        (uplands & (t < 0.3) & (m > 0.5), "forest"),
+        (uplands & (t < 0.3), "highlands"),
+        (uplands & (t > 0.7) & (m < 0.3), "desert"),
+        (uplands & (t > 0.7), "savannah"),
+        (uplands & (m > 0.65), "forest"),
+        (uplands & (m < 0.35), "highlands"),
+        (uplands, "hills"),
+
+        (midlands & (t < 0.25), "forest"),  # Cold forest (taiga-like)
+        (midlands & (t > 0.75) & (m < 0.3), "desert"),
+        (midlands & (t > 0.75) & (m > 0.7), "jungle"),
+        (midlands & (t > 0.75), "savannah"),
+        (midlands & (m > 0.7) & (t > 0.6), "jungle"),
+        (midlands & (m > 0.7), "forest"),
+        (midlands & (m > 0.5), "grasslands"),
+        (midlands, "plains"),
+
+        # Low elevation (< 0.15)
+        ((t < 0.3) & (m > 0.6), "marsh"),
+        (t < 0.3, "grasslands"),
+        ((t > 0.7) & (m < 0.35), "coastal_desert"),
+        ((t > 0.7) & (m > 0.7), "jungle"),
+        (t > 0.7, "savannah"),
+        (m > 0.65, "marsh"),
+        (m > 0.45, "grasslands"),
+    ]
+
+    return np.select(
+        [cond for cond, _ in rules],
+        [TERRAIN_IDS[name] for _, name in rules],
+        default=TERRAIN_IDS["plains"]
+    )
 
 
 def generate_terrain_map(
@@ -280,84 +289,85 @@ def generate_terrain_map(
     output_dir: Path,
     hex_size: float = 32,
     seed: int = 42,
-    sea_level: int = 94
+    sea_level: int = 94,
+    noise_octaves: int = 1
 ) -> None:
     """
     Generate terrain map with hexagonal provinces.
     """
     print(f"Loading heightmap: {heightmap_path}")
 
-    heightmap = Image.open(heightmap_path).convert('RGB')
+    # Height is the first channel (what the engine reads). Grayscale
+    # heightmaps are used as-is and RGB(A) ones give up their red band
+    # directly; only other modes are expanded to RGB first
+    heightmap = Image.open(heightmap_path)
+    if heightmap.mode in ('RGB', 'RGBA'):
+        heightmap = heightmap.getchannel(0)
+    elif heightmap.mode != 'L':
+        heightmap = heightmap.convert('RGB').getchannel(0)
     width, height = heightmap.size
-    height_pixels = heightmap.load()
+    height_arr = np.asarray(heightmap)
 
     print(f"Heightmap size: {width}x{height}")
     print(f"Hex size: {hex_size}, Sea level: {sea_level}")
 
-    # Create terrain image with ocean as default
-    ocean_rgb = get_terrain_rgb("ocean")
-    terrain_img = Image.new('RGB', (width, height), ocean_rgb)
-    draw = ImageDraw.Draw(terrain_img)
-
     noise = PerlinNoise(seed)
 
-    # Hexagon spacing (must match province map generator!)
-    hex_width = hex_size * 2
-    hex_height = hex_size * math.sqrt(3)
-    col_spacing = hex_width * 0.75
-    row_spacing = hex_height
+    # Hexagon grid shared with the heightmap and province generators
+    cols, rows, _, _ = grid_layout(width, height, hex_size)
+    print(f"Generating {cols}x{rows} hexagon terrain grid...")
 
-    cols = int(width / col_spacing) + 2
-    rows = int(height / row_spacing) + 2
+    # Calculate every center at once
+    cx, cy = hex_centers(width, height, hex_size)
 
-    terrain_counts = {}
-    hex_count = 0
+    # Sample height at hex centers (truncate, then clamp to valid pixels)
+    sample_x = np.clip(cx.astype(np.int32), 0, width - 1)
+    sample_y = np.clip(cy.astype(np.int32), 0, height - 1)
+    heights = height_arr[sample_y, sample_x]
 
-    print(f"Generating {cols}x{rows} hexagon terrain grid...")
+    # Deep ocean only depends on height - biome noise is needed elsewhere
+    needs_biome = heights >= sea_level - 5
+    moisture = np.zeros(len(heights))
+    temperature = np.zeros(len(heights))
+    moisture[needs_biome], temperature[needs_biome] = compute_biome_fields(
+        noise, cx[needs_biome], cy[needs_biome], width, height, noise_octaves
+    )
 
-    for col in range(cols):
-        for row in range(rows):
-            # Calculate center (must match province generator!)
-            cx = col * col_spacing + hex_size
-            cy = row * row_spacing + hex_height / 2
-            if col % 2 == 1:
-                cy += row_spacing / 2
-
-            # Skip if outside bounds
-            if cx < -hex_size or cx > width + hex_size:
-                continue
-            if cy < -hex_size or cy > height + hex_size:
-                continue
-
-            # Sample height at hex center
-            sample_x = max(0, min(width - 1, int(cx)))
-            sample_y = max(0, min(height - 1, int(cy)))
-            h = height_pixels[sample_x, sample_y][0]
-
-            # Determine terrain
-            terrain_name = determine_terrain_for_hex(
-                h, cx, cy, width, height, noise, sea_level
-            )
-
-            # Draw hexagon with terrain color
-            rgb = get_terrain_rgb(terrain_name)
-            draw_hexagon(draw, cx, cy, hex_size, rgb)
-
-            terrain_counts[terrain_name] = terrain_counts.get(terrain_name, 0) + 1
-            hex_count += 1
+    # Determine terrain for all hexagons at once
+    terrain_ids = classify_terrain(heights, moisture, temperature, sea_level)
+    terrain_rgb = build_terrain_rgb_table()
+
+    # Create terrain image with ocean as default
+    ocean_rgb = tuple(terrain_rgb[TERRAIN_IDS["ocean"]].tolist())
+    terrain_img = Image.new('RGB', (width, height), ocean_rgb)
+    draw = ImageDraw.Draw(terrain_img)
+
+    # Draw hexagons with terrain colors
+    draw_hexagons(draw, cx, cy, hex_size, map(tuple, terrain_rgb[terrain_ids].tolist()))
 
     # Save terrain map as PNG (simple RGB, no palette confusion)
     terrain_path = output_dir / "terrain.png"
-    terrain_img.save(terrain_path, "PNG")
+    terrain_img.save(terrain_path, "PNG", compress_level=PNG_COMPRESS_LEVEL)
     print(f"Saved: {terrain_path}")
 
     # Print distribution
+    hex_count = len(terrain_ids)
+    terrain_counts = np.bincount(terrain_ids, minlength=len(TERRAIN_NAMES))
     print(f"\nTerrain distribution ({hex_count} hexagons):")
-    for terrain, count in sorted(terrain_counts.items(), key=lambda x: -x[1]):
+    for terrain_id in np.argsort(-terrain_counts, kind="stable"):
+        count = int(terrain_counts[terrain_id])
+        if count == 0:
+            continue
         pct = count / hex_count * 100
-        print(f"  {terrain}: {count} ({pct:.1f}%)")
+        print(f"  {TERRAIN_NAMES[terrain_id]}: {count} ({pct:.1f}%)")
 
 
+def positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
 
 
 def main():
@@ -386,6 +396,10 @@ def main():
         '--sea-level', type=int, default=94,
         help='Sea level grayscale value (default: 94)'
     )
+    parser.add_argument(
+        '--noise-octaves', type=positive_int, default=1,
+        help='Octaves of biome noise - more = less regular biome borders (default: 1)'
+    )
 
     args = parser.parse_args()
 
@@ -410,7 +424,8 @@ def main():
         output_dir=output_dir,
         hex_size=args.hex_size,
         seed=args.seed,
-        sea_level=args.sea_level
+        sea_level=args.sea_level,
+        noise_octaves=args.noise_octaves
     )
 
     print("\nDone!")
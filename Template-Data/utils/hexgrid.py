@@ -0,0 +1,67 @@
+"""
+Shared hexagon grid for the Archon Engine template generators.
+
+Flat-top hexagons, odd columns shifted down by half a row. The heightmap,
+terrain and province generators all place and draw their hexagons through
+this module, so the three maps share identical hexagon edges.
+"""
+
+import math
+
+import numpy as np
+from PIL import ImageDraw
+
+
+# Unit vertex offsets of a flat-top hexagon (60 degrees per vertex)
+HEX_UNIT = [(math.cos(math.pi / 3 * i), math.sin(math.pi / 3 * i)) for i in range(6)]
+
+
+def grid_layout(width: int, height: int, hex_size: float) -> tuple[int, int, float, float]:
+    """
+    Size of the hexagon grid covering a width x height image.
+    Returns (cols, rows, col_spacing, row_spacing).
+    """
+    hex_width = hex_size * 2
+    hex_height = hex_size * math.sqrt(3)
+
+    # Horizontal and vertical spacing
+    col_spacing = hex_width * 0.75  # 3/4 of hex width for overlap
+    row_spacing = hex_height
+
+    cols = int(width / col_spacing) + 2
+    rows = int(height / row_spacing) + 2
+    return cols, rows, col_spacing, row_spacing
+
+
+def hex_centers(width: int, height: int, hex_size: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Calculate the center of every hexagon that overlaps the image.
+    Returns arrays (cx, cy) in draw order: column by column, top to bottom.
+    Province IDs are assigned in this order.
+    """
+    cols, rows, col_spacing, row_spacing = grid_layout(width, height, hex_size)
+    hex_height = row_spacing
+
+    # Centers laid out (cols, rows); offset every other column
+    col_idx = np.arange(cols)[:, None]
+    row_idx = np.arange(rows)[None, :]
+    cx = np.broadcast_to(col_idx * col_spacing + hex_size, (cols, rows))
+    cy = row_idx * row_spacing + hex_height / 2 + (col_idx % 2) * (row_spacing / 2)
+
+    # Skip if center is outside image bounds (with margin)
+    in_bounds = (
+        (cx >= -hex_size) & (cx <= width + hex_size) &
+        (cy >= -hex_size) & (cy <= height + hex_size)
+    )
+    return cx[in_bounds], cy[in_bounds]
+
+
+def draw_hexagons(draw: ImageDraw.Draw, cx: np.ndarray, cy: np.ndarray, size: float, colors) -> None:
+    """
+    Draw a filled hexagon at each center, in the order given.
+    Later hexagons paint over the shared edge pixels of earlier ones, so
+    every map must draw the same centers in the same (hex_centers) order.
+    """
+    offsets = [(size * dx, size * dy) for dx, dy in HEX_UNIT]
+    for x, y, color in zip(cx.tolist(), cy.tolist(), colors):
+        draw.polygon([(x + ox, y + oy) for ox, oy in offsets], fill=color)
@@ -0,0 +1,100 @@
+"""
+Shared Perlin noise for the Archon Engine template generators.
+
+The heightmap and terrain generators both use this one implementation, so
+a seed always maps to the same permutation table in both.
+"""
+
+import random
+from functools import lru_cache
+
+import numpy as np
+
+
+@lru_cache(maxsize=None)
+def _permutation_table(seed: int) -> np.ndarray:
+    """
+    Shuffled 0-255 permutation for a seed (read-only, shared by all instances).
+    A private RNG keeps the legacy order for a given seed without reseeding
+    the global random module.
+    """
+    perm = list(range(256))
+    random.Random(seed).shuffle(perm)
+    table = np.array(perm, dtype=np.uint8)
+    table.flags.writeable = False
+    return table
+
+
+class PerlinNoise:
+    """Simple Perlin noise generator operating on NumPy arrays."""
+
+    def __init__(self, seed: int = 0):
+        self.seed = seed
+        self.p = _permutation_table(seed)
+
+    def _fade(self, t: np.ndarray) -> np.ndarray:
+        """Smoothstep function."""
+        return t * t * t * (t * (t * 6 - 15) + 10)
+
+    def _lerp(self, a: np.ndarray, b: np.ndarray, t: np.ndarray) -> np.ndarray:
+        """Linear interpolation."""
+        return a + t * (b - a)
+
+    def _grad(self, hash_val: np.ndarray, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Gradient function (branchless: bit 0 flips x, bit 1 flips y)."""
+        h = hash_val.astype(np.int32) & 3
+        return (1 - ((h & 1) << 1)) * x + (1 - (h & 2)) * y
+
+    def noise2d(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """
+        Generate 2D Perlin noise values for arrays of coordinates.
+        Returns values in range [-1, 1].
+        """
+        p = self.p
+
+        # Grid cell coordinates
+        x_floor = np.floor(x)
+        y_floor = np.floor(y)
+        xi = x_floor.astype(np.int32) & 255
+        yi = y_floor.astype(np.int32) & 255
+        xi1 = (xi + 1) & 255
+
+        # Relative position in cell
+        xf = x - x_floor
+        yf = y - y_floor
+
+        # Fade curves
+        u = self._fade(xf)
+        v = self._fade(yf)
+
+        # Hash coordinates of corners; indices wrap with & 255 instead of
+        # reading a doubled table
+        aa = p[(p[xi] + yi) & 255]
+        ab = p[(p[xi] + yi + 1) & 255]
+        ba = p[(p[xi1] + yi) & 255]
+        bb = p[(p[xi1] + yi + 1) & 255]
+
+        # Blend gradients
+        x1 = self._lerp(self._grad(aa, xf, yf), self._grad(ba, xf - 1, yf), u)
+        x2 = self._lerp(self._grad(ab, xf, yf - 1), self._grad(bb, xf - 1, yf - 1), u)
+
+        return self._lerp(x1, x2, v)
+
+    def octave_noise_grid(self, x: np.ndarray, y: np.ndarray, octaves: int = 6,
+                          persistence: float = 0.5, lacunarity: float = 2.0) -> np.ndarray:
+        """
+        Generate fractal noise for arrays of coordinates by combining octaves.
+        A single octave is plain noise2d. Returns values in range approximately [-1, 1].
+        """
+        total = np.zeros(np.shape(x))
+        amplitude = 1.0
+        frequency = 1.0
+        max_value = 0.0
+
+        for _ in range(octaves):
+            total += self.noise2d(x * frequency, y * frequency) * amplitude
+            max_value += amplitude
+            amplitude *= persistence
+            frequency *= lacunarity
+
+        return total / max_value